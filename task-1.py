@@ -1,80 +1,152 @@
 import pickle
+import sys
 from collections import UserDict
-import re
-from datetime import datetime, timedelta
+from datetime import date, datetime
+
+_DATE_FMT = '%d.%m.%Y'
+
+# Days to add so a birthday falling on Saturday or Sunday moves to Monday
+_WEEKDAY_SHIFT = (0, 0, 0, 0, 0, 2, 1)
+
+
+def _parse_date(value):
+    # Fast path for zero-padded DD.MM.YYYY, strptime handles everything else
+    if len(value) == 10 and value[2] == value[5] == '.' and value.isascii():
+        day, month, year = value[0:2], value[3:5], value[6:10]
+        if day.isdigit() and month.isdigit() and year.isdigit():
+            return date(int(year), int(month), int(day))
+    return datetime.strptime(value, _DATE_FMT).date()
+
+
+def _birthday_in_year(birthday, year):
+    # A 29.02 birthday is celebrated on 28.02 in non-leap years
+    try:
+        return birthday.replace(year=year)
+    except ValueError:
+        return birthday.replace(year=year, day=28)
+
+
+def _restore_slots(obj, state):
+    # Objects pickled before __slots__ was added carry a plain __dict__ state
+    if isinstance(state, tuple):
+        state = state[1]
+    for key, value in state.items():
+        setattr(obj, key, value)
 
 
 # Field Classes
 
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+
     def __str__(self):
         return str(self.value)
 
 
 class Name(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         if not self._validate(value):
             raise ValueError("Phone number must be 10 digits.")
         super().__init__(value)
 
     def _validate(self, phone_number):
-        return bool(re.match(r'^\d{10}$', phone_number))
+        return len(phone_number) == 10 and phone_number.isdecimal()
 
 
 class Birthday(Field):
+    __slots__ = ("_date",)
+
     def __init__(self, value):
-        if not self._validate(value):
+        parsed = self._parse(value)
+        if parsed is None:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
         super().__init__(value)
+        self._date = parsed
+
+    def __setstate__(self, state):
+        # Birthdays pickled before the parsed date was cached need a reparse
+        _restore_slots(self, state)
+        if not hasattr(self, "_date"):
+            self._date = self._parse(self.value)
 
-    def _validate(self, birthday):
+    def _parse(self, birthday):
         try:
-            datetime.strptime(birthday, '%d.%m.%Y')
-            return True
+            return _parse_date(birthday)
         except ValueError:
-            return False
+            return None
 
     def to_date(self):
-        return datetime.strptime(self.value, '%d.%m.%Y').date()
+        return self._date
 
 
 # Record Class
 
 class Record:
+    __slots__ = ("name", "phones", "birthday", "_phone_index")
+
     def __init__(self, name):
         self.name = Name(name)
         self.phones = []
         self.birthday = None
+        self._phone_index = {}
+
+    def __setstate__(self, state):
+        # Records pickled before the phone index existed lack it, so rebuild it
+        _restore_slots(self, state)
+        if not hasattr(self, "_phone_index"):
+            # Older books may hold the same number twice, keep only the first copy
+            self._phone_index = {}
+            phones = []
+            for phone in self.phones:
+                if phone.value not in self._phone_index:
+                    self._phone_index[phone.value] = phone
+                    phones.append(phone)
+            self.phones = phones
 
     def add_phone(self, phone_number):
-        self.phones.append(Phone(phone_number))
+        if phone_number in self._phone_index:
+            raise ValueError("Phone number already exists.")
+        phone = Phone(phone_number)
+        self.phones.append(phone)
+        self._phone_index[phone_number] = phone
 
     def remove_phone(self, phone_number):
-        phone_to_remove = self.find_phone(phone_number)
+        phone_to_remove = self._phone_index.pop(phone_number, None)
         if phone_to_remove:
             self.phones.remove(phone_to_remove)
 
     def edit_phone(self, old_phone_number, new_phone_number):
         phone_to_edit = self.find_phone(old_phone_number)
-        if phone_to_edit:
-            self.add_phone(new_phone_number)
-            self.remove_phone(old_phone_number)
-        else:
+        if not phone_to_edit:
             raise ValueError("Old phone does not exist so it is cannot be edited")
+        if not phone_to_edit._validate(new_phone_number):
+            raise ValueError("Phone number must be 10 digits.")
+        if new_phone_number in self._phone_index:
+            # The new number is already on the record, so only the old one has to go
+            if new_phone_number != old_phone_number:
+                self.remove_phone(old_phone_number)
+            return
+        phone_to_edit.value = new_phone_number
+        del self._phone_index[old_phone_number]
+        self._phone_index[new_phone_number] = phone_to_edit
 
     def find_phone(self, phone_number):
-        for phone in self.phones:
-            if phone.value == phone_number:
-                return phone
-        return None
+        return self._phone_index.get(phone_number)
 
     def add_birthday(self, birthday):
         self.birthday = Birthday(birthday)
@@ -88,13 +160,13 @@ class Record:
         if not self.birthday:
             return None
         today = datetime.now().date()
-        next_birthday = self.birthday.to_date().replace(year=today.year)
+        next_birthday = _birthday_in_year(self.birthday.to_date(), today.year)
         if today > next_birthday:
-            next_birthday = next_birthday.replace(year=today.year + 1)
+            next_birthday = _birthday_in_year(self.birthday.to_date(), today.year + 1)
         return (next_birthday - today).days
 
     def __str__(self):
-        phones_str = "; ".join(str(phone) for phone in self.phones)
+        phones_str = "; ".join([phone.value for phone in self.phones])
         birthday_str = f", birthday: {self.birthday}" if self.birthday else ""
         return f"Contact name: {self.name}, phones: {phones_str}{birthday_str}"
 
@@ -114,24 +186,25 @@ class AddressBook(UserDict):
 
     def get_upcoming_birthdays(self):
         today = datetime.now().date()
+        today_ord = today.toordinal()
+        today_month_day = (today.month, today.day)
         upcoming_birthdays = []
 
         for record in self.data.values():
             if record.birthday:
                 birthday = record.birthday.to_date()
-                birthday = birthday.replace(year=today.year)
 
                 # Check next year if birthday is already passed
-                if birthday < today:
-                    birthday = birthday.replace(year=today.year + 1)
+                year = today.year
+                if (birthday.month, birthday.day) < today_month_day:
+                    year += 1
+                birthday = _birthday_in_year(birthday, year)
 
-                days_until_birthday = (birthday - today).days
+                birthday_ord = birthday.toordinal()
+                days_until_birthday = birthday_ord - today_ord
                 if days_until_birthday <= 7:
-                    if birthday.weekday() == 5:  # Saturday
-                        days_until_birthday += 2
-                    if birthday.weekday() == 6:  # Sunday
-                        days_until_birthday += 1
-                    congratulation_date = today + timedelta(days=days_until_birthday)
+                    # Weekend birthdays are congratulated on the following Monday
+                    congratulation_date = date.fromordinal(birthday_ord + _WEEKDAY_SHIFT[birthday.weekday()])
                     upcoming_birthdays.append(
                         {"name": record.name.value, "congratulation_date": congratulation_date.strftime("%Y.%m.%d")})
 
@@ -195,9 +268,9 @@ def show_phone(args, book: AddressBook):
     return "; ".join(str(phone) for phone in record.phones)
 
 
-@input_error
-def show_all(book: AddressBook):
-    return "\n".join(str(record) for record in book.data.values())
+def show_all(args, book: AddressBook):
+    # Yield one line per record so main can stream them without building the whole listing
+    return (f"{record}\n" for record in book.data.values())
 
 
 @input_error
@@ -234,11 +307,21 @@ def birthdays(args, book: AddressBook):
         f"Upcoming birthday: {user['name']} on {user['congratulation_date']}" for user in upcoming_birthdays)
 
 
+COMMANDS = {
+    "add": add_contact,
+    "change": change_contact,
+    "phone": show_phone,
+    "add-birthday": add_birthday,
+    "show-birthday": show_birthday,
+    "birthdays": birthdays,
+}
+
+
 # Serialization Functions
 
 def save_data(book, filename="addressbook.pkl"):
     with open(filename, "wb") as f:
-        pickle.dump(book, f)
+        pickle.dump(book, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 def load_data(filename="addressbook.pkl"):
@@ -275,26 +358,11 @@ def main():
         elif command == "hello":
             print("How can I help you?")
 
-        elif command == "add":
-            print(add_contact(args, book))
-
-        elif command == "change":
-            print(change_contact(args, book))
-
-        elif command == "phone":
-            print(show_phone(args, book))
-
         elif command == "all":
-            print(show_all(book))
-
-        elif command == "add-birthday":
-            print(add_birthday(args, book))
-
-        elif command == "show-birthday":
-            print(show_birthday(args, book))
+            sys.stdout.writelines(show_all(args, book))
 
-        elif command == "birthdays":
-            print(birthdays(args, book))
+        elif command in COMMANDS:
+            print(COMMANDS[command](args, book))
 
         else:
             print("Invalid command.")